@@ -1,10 +1,12 @@
 import re
-from typing import List, Set, Tuple
+from typing import List, Tuple
 
 
-NON_EVENT_KEYWORDS: Set[str] = {"congratulations", "bus fare", "birthday"}
+NON_EVENT_KEYWORDS: frozenset[str] = frozenset(
+    {"congratulations", "bus fare", "birthday"}
+)
 
-# TIME_KEYWORDS: Set[str] = {
+# TIME_KEYWORDS: frozenset[str] = frozenset({
 #     "today",
 #     "tomorrow",
 #     "this week",
@@ -25,7 +27,7 @@ NON_EVENT_KEYWORDS: Set[str] = {"congratulations", "bus fare", "birthday"}
 #     "evening",
 #     "noon",
 #     "midnight",
-# }
+# })
 
 
 EMAIL_FOOTER_KEYWORD: str = (
@@ -217,7 +217,31 @@ async def sync_user_inbox_once(user_id: str, max_results: int = 10) -> int:
     return await process_messages(user_id, msgs)
 
 
+# One lock per user so the multi-worker queue never runs two jobs for the
+# same user concurrently: login and startup both enqueue back-to-back syncs,
+# and running them in parallel would re-read the same lastProcessedMessageId,
+# double-process the same messages, and race the find_first-then-create
+# calendar dedup into duplicate events. Jobs for different users still
+# proceed in parallel.
+_user_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _get_user_lock(user_id: str) -> asyncio.Lock:
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        lock = _user_locks.setdefault(user_id, asyncio.Lock())
+    return lock
+
+
 async def handle_job(job: Dict[str, Any]) -> None:
+    user_id = job.get("user_id")
+    if user_id is None:
+        return
+    async with _get_user_lock(str(user_id)):
+        await _handle_job_locked(job)
+
+
+async def _handle_job_locked(job: Dict[str, Any]) -> None:
     kind = job.get("type")
     if kind == "sync_inbox_once":
         user_id = job["user_id"]
@@ -1,14 +1,13 @@
 from __future__ import annotations
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
-import google.api_core.exceptions
-import json
+import httpx
+import orjson
 import os
+import random
 from typing import Optional, Dict, List, Any
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
 
 from app.model.llm import (
@@ -18,45 +17,54 @@ from app.model.llm import (
     EmailMessage,
 )
 
-from app.constants.constants import (
-    EMAIL_FOOTER_KEYWORD,
-    NON_EVENT_KEYWORDS,
-)
+from app.constants.constants import EMAIL_FOOTER_KEYWORD
+from app.services.ml_utils import prefilter_emails
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on the body text sent to the LLM per email, applied after the
+# boilerplate footer is stripped so the cap spends tokens on real content.
+MAX_PROMPT_BODY_CHARS = 8000
 
-class AsyncEventAgent:
-    def __init__(self, max_workers: int = 4):
-        self.max_workers = max_workers
-        self.thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+GEMINI_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/"
+    f"{GEMINI_MODEL}:generateContent"
+)
+_GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "maxOutputTokens": 8000,
+    "responseMimeType": "application/json",
+}
+
+
+def _strip_footer(body: str) -> str:
+    """Drop the institutional footer (and everything after it) from a body."""
+    idx = body.lower().find(EMAIL_FOOTER_KEYWORD)
+    if idx != -1:
+        body = body[:idx]
+    return body.strip()
 
+
+class AsyncEventAgent:
+    def __init__(self):
         api_keys_str = os.environ.get("GEMINI_API_KEYS")
         if not api_keys_str:
             raise ValueError("GEMINI_API_KEYS environment variable not set or empty")
 
         self.api_keys = [key.strip() for key in api_keys_str.split(",")]
-        self.client_index = 0
 
         if not self.api_keys:
             raise ValueError("No valid Gemini API keys found.")
 
-        self.models = []
-        for i, api_key in enumerate(self.api_keys):
-            genai.configure(api_key=api_key)  # type: ignore[attr-defined]
-            model = genai.GenerativeModel(  # type: ignore[attr-defined]
-                model_name="gemini-2.0-flash-exp",
-                generation_config=GenerationConfig(
-                    temperature=0.1,
-                    max_output_tokens=8000,
-                    response_mime_type="application/json",
-                ),
-            )
-            self.models.append((api_key, model))
+        # One shared HTTP client for all Gemini calls; the API key travels
+        # as a per-request query parameter, so any number of keys can be in
+        # flight concurrently without shared state.
+        self._client = httpx.AsyncClient(timeout=60.0)
 
         logger.info(
-            f"ML Models loaded. Found {len(self.api_keys)} Gemini API keys with {max_workers} workers."
+            f"Gemini REST client ready. Found {len(self.api_keys)} API keys."
         )
 
         if len(self.api_keys) == 1:
@@ -64,35 +72,22 @@ class AsyncEventAgent:
                 "Single API key detected - will process batches sequentially to avoid rate limits"
             )
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        self.thread_pool.shutdown(wait=True)
-
-    def _run_in_thread(self, func, *args, **kwargs):
-        """Run CPU-bound operations in thread pool"""
-        loop = asyncio.get_event_loop()
-        return loop.run_in_executor(self.thread_pool, func, *args, **kwargs)
-
-    def _execute_gemini_call(
+    async def _execute_gemini_call(
         self,
         filtered_emails: List[Dict],
         user_interests: List[str],
         api_key: str,
-        model,
     ) -> List[Dict]:
-        """
-        Synchronous method to execute a single, non-retrying API call to Gemini and designed to run in a thread.
-        """
-        genai.configure(api_key=api_key) 
-        today_iso = datetime.now().isoformat()
-
-        emails_text = ""
-        for i, email in enumerate(filtered_emails):
-            emails_text += f"\n--- EMAIL {i + 1} (ID: {email['id']}) ---\n"
-            emails_text += f"Subject: {email['subject']}\n"
-            emails_text += f"Content: {email['content']}\n"
+        """Execute a single, non-retrying generateContent call to Gemini."""
+        now = datetime.now()
+        horizon = now + timedelta(days=180)
+
+        emails_text = "".join(
+            f"\n--- EMAIL {i + 1} (ID: {email['id']}) ---\n"
+            f"Subject: {email['subject']}\n"
+            f"Content: {email['content']}\n"
+            for i, email in enumerate(filtered_emails)
+        )
 
         prompt = f"""You are an expert event parser.These events could also be deadlines .Extract event details from the emails below and return them as a JSON array.
 
@@ -106,7 +101,7 @@ VALIDATION RULES:
 OUTPUT FORMAT - Return ONLY a JSON array of valid events:
 [
   {{
-    "source_message_id": "{email["id"]}",
+    "source_message_id": "<ID of the email the event came from>",
     "title": "Official event title (max 100 chars)",
     "location": "Event location if offline else 'Online'",
     "summary": "2-line description of the event",
@@ -126,17 +121,33 @@ If no valid events found, return: [summary of event in one line and why it was i
 
 EMAILS:{emails_text}"""
 
+        request_body = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": _GENERATION_CONFIG,
+        }
+
         response_text = ""
         try:
-            response = model.generate_content(prompt)
-            response_text = response.text
+            resp = await self._client.post(
+                GEMINI_URL, params={"key": api_key}, json=request_body
+            )
+            resp.raise_for_status()
+            data = resp.json()
+
+            candidates = data.get("candidates") or []
+            parts = (
+                candidates[0].get("content", {}).get("parts", [])
+                if candidates
+                else []
+            )
+            response_text = "".join(p.get("text", "") for p in parts)
             if not response_text:
                 logger.warning(
                     f"Empty response from Gemini on API key ending in ...{api_key[-4:]}"
                 )
                 return []
 
-            events = json.loads(response_text)
+            events = orjson.loads(response_text)
             logger.info(
                 f"Gemini returned {len(events)} events for batch of {len(filtered_emails)} emails"
             )
@@ -153,10 +164,8 @@ EMAILS:{emails_text}"""
                 if not start_datetime:
                     continue
                 try:
-                    parsed_dt = datetime.fromisoformat(
-                        start_datetime.replace("Z", "+00:00")
-                    )
-                    if parsed_dt <= datetime.now():
+                    parsed_dt = datetime.fromisoformat(start_datetime)
+                    if parsed_dt <= now or parsed_dt >= horizon:
                         continue
                 except ValueError:
                     continue
@@ -169,11 +178,11 @@ EMAILS:{emails_text}"""
             )
             return valid_events
 
-        except (json.JSONDecodeError, google.api_core.exceptions.GoogleAPIError) as e:
+        except (orjson.JSONDecodeError, httpx.HTTPError) as e:
             logger.warning(
                 f"API call failed for key ...{api_key[-4:]}: {e}. This may trigger a retry."
             )
-            if isinstance(e, json.JSONDecodeError):
+            if isinstance(e, orjson.JSONDecodeError):
                 logger.error(
                     f"--- RAW GEMINI RESPONSE ---:\n{response_text}\n--- END RAW RESPONSE ---"
                 )
@@ -204,12 +213,12 @@ EMAILS:{emails_text}"""
                 logger.info("Starting initial attempt cycle for batch.")
 
             max_attempts_per_key = 3
-            num_keys = len(self.models)
+            num_keys = len(self.api_keys)
             total_rotational_attempts = num_keys * max_attempts_per_key
 
             for attempt in range(total_rotational_attempts):
                 key_index = attempt % num_keys
-                api_key, model = self.models[key_index]
+                api_key = self.api_keys[key_index]
                 key_display = f"...{api_key[-4:]}"
 
                 logger.info(
@@ -218,23 +227,27 @@ EMAILS:{emails_text}"""
                 )
 
                 try:
-                    result = await self._run_in_thread(
-                        self._execute_gemini_call,
+                    result = await self._execute_gemini_call(
                         emails,
                         user_interests,
                         api_key,
-                        model,
                     )
                     logger.info(f"Successfully processed batch in cycle {cycle + 1}.")
                     return result
 
                 except Exception as e:
                     last_exception = e
+                    # Exponential backoff with jitter so concurrent batches
+                    # don't hammer the API in lockstep after a failure.
+                    delay = min(30.0, 2.0 * (2 ** (attempt // num_keys)))
+                    delay *= random.uniform(0.5, 1.5)
                     logger.warning(
-                        f"Rotational attempt {attempt + 1} failed. Retrying with next key..."
+                        f"Rotational attempt {attempt + 1} failed. Retrying with "
+                        f"next key in {delay:.1f}s..."
                     )
-                    await asyncio.sleep(2)
-                    
+                    await asyncio.sleep(delay)
+
+
             if cycle < total_cycles - 1:
                 logger.warning(
                     f"Full attempt cycle {cycle + 1} failed. Waiting {wait_between_cycles_seconds} "
@@ -256,12 +269,18 @@ EMAILS:{emails_text}"""
         if not email_batches:
             return []
 
-        tasks = [
-            self._process_gemini_batch(batch, user_interests)
-            for batch in email_batches
-        ]
+        # Bound in-flight batches to what the key pool can absorb; each
+        # batch starts as soon as a slot frees rather than all at once.
+        sem = asyncio.Semaphore(max(1, 2 * len(self.api_keys)))
 
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def run_batch(batch: List[Dict]) -> List[Dict]:
+            async with sem:
+                return await self._process_gemini_batch(batch, user_interests)
+
+        batch_results = await asyncio.gather(
+            *(run_batch(batch) for batch in email_batches),
+            return_exceptions=True,
+        )
 
         all_events = []
         for idx, result in enumerate(batch_results):
@@ -280,10 +299,9 @@ EMAILS:{emails_text}"""
         self, emails: List[Dict], chunk_size: int = 10
     ) -> List[List[Dict]]:
         """Split emails into chunks for parallel processing"""
-        chunks = []
-        for i in range(0, len(emails), chunk_size):
-            chunks.append(emails[i : i + chunk_size])
-        return chunks
+        return [
+            emails[i : i + chunk_size] for i in range(0, len(emails), chunk_size)
+        ]
 
     async def process_emails_batch_async(
         self, emails: List[EmailMessage], user_interests: List[str]
@@ -305,13 +323,21 @@ EMAILS:{emails_text}"""
             email_dicts.append({
                 "id": email.id,
                 "subject": email_title,
-                "content": email_body,
+                "content": _strip_footer(email_body)[:MAX_PROMPT_BODY_CHARS],
             })
 
         logger.info(f"Prepared {len(email_dicts)} emails for processing")
 
+        # Cheap pre-LLM filter: drop emails that hit a non-event keyword or
+        # carry no usable date/time signal, so they never reach a Gemini batch.
+        filtered_dicts = prefilter_emails(email_dicts)
+
+        logger.info(
+            f"{len(filtered_dicts)}/{len(email_dicts)} emails passed pre-LLM filter"
+        )
+
         # Split into batches of 10
-        email_chunks = self._chunk_emails(email_dicts, chunk_size=10)
+        email_chunks = self._chunk_emails(filtered_dicts, chunk_size=10)
         logger.info(f"Created {len(email_chunks)} chunks of emails")
 
         # Process all batches through Gemini
@@ -343,8 +369,8 @@ EMAILS:{emails_text}"""
                 if not end_dt_str:
                     end_dt_str = start_dt_str
 
-                start_time = datetime.fromisoformat(start_dt_str.replace("Z", "+00:00"))
-                end_time = datetime.fromisoformat(end_dt_str.replace("Z", "+00:00"))
+                start_time = datetime.fromisoformat(start_dt_str)
+                end_time = datetime.fromisoformat(end_dt_str)
 
                 if start_time.tzinfo is None:
                     start_time = start_time.replace(tzinfo=default_tz)
@@ -376,25 +402,32 @@ EMAILS:{emails_text}"""
         return proposed_events
 
 
-async def extract_events_async(payload: LLMExtractionInput) -> LLMExtractionOutput:
-    """Async extraction with parallel processing"""
+@functools.lru_cache(maxsize=1)
+def get_agent() -> AsyncEventAgent:
+    """Return the process-wide agent, constructing it on first use."""
+    return AsyncEventAgent()
+
+
+async def extract_events(payload: LLMExtractionInput) -> LLMExtractionOutput:
+    """Main entry point: async extraction with parallel processing"""
     try:
-        async with AsyncEventAgent(max_workers=4) as agent:
-            all_interests = payload.interests + payload.custom_interests
-            extracted_events = await agent.process_emails_batch_async(
-                payload.emails, all_interests
-            )
+        all_interests = payload.interests + payload.custom_interests
+        if not all_interests:
             logger.info(
-                f"Extracted {len(extracted_events)} events from {len(payload.emails)} emails"
+                f"User {payload.user_id} has no interests configured; "
+                "skipping LLM extraction"
             )
-            logger.info(f"Number of events extracted: {len(extracted_events)}")
-            return LLMExtractionOutput(events=extracted_events)
+            return LLMExtractionOutput(events=[])
+
+        agent = get_agent()
+        extracted_events = await agent.process_emails_batch_async(
+            payload.emails, all_interests
+        )
+        logger.info(
+            f"Extracted {len(extracted_events)} events from {len(payload.emails)} emails"
+        )
+        return LLMExtractionOutput(events=extracted_events)
 
     except Exception as e:
-        logger.error(f"Critical error in extract_events_async: {e}")
+        logger.error(f"Critical error in extract_events: {e}")
         return LLMExtractionOutput(events=[])
-
-
-async def extract_events(payload: LLMExtractionInput) -> LLMExtractionOutput:
-    """Main entry point"""
-    return await extract_events_async(payload)
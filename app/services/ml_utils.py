@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import dateparser
+
+from app.constants.constants import NON_EVENT_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+
+_TIME_PATTERNS: List[str] = [
+    r"\b\d{1,2}:\d{2}(?::\d{2})?\s*(?:am|pm)?\b",
+    r"\b\d{1,2}\s*(?:am|pm)\b",
+    r"\b(?:noon|midnight)\b",
+]
+
+_MONTHS = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|"
+    r"jul(?:y)?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|"
+    r"dec(?:ember)?)"
+)
+
+_DATE_PATTERNS: List[str] = [
+    r"\b\d{4}-\d{2}-\d{2}\b",
+    r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",
+    rf"\b{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{4}})?\b",
+    rf"\b\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTHS}\b",
+    r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+    r"\b(?:today|tonight|tomorrow)\b",
+]
+
+# Compiled once at import time, fused into one alternation per category, so
+# every email body is scanned once per category instead of once per pattern.
+_TIME_RE = re.compile("|".join(f"(?:{p})" for p in _TIME_PATTERNS), re.IGNORECASE)
+_DATE_RE = re.compile("|".join(f"(?:{p})" for p in _DATE_PATTERNS), re.IGNORECASE)
+
+# Fast-path parsing for the narrow set of shapes _DATE_RE can emit, so the
+# hot loop rarely has to fall back to the (much slower) dateparser library.
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_SLASH_DATE_RE = re.compile(r"(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})")
+_MONTH_DAY_RE = re.compile(
+    rf"({_MONTHS})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s*(\d{{4}}))?"
+)
+_DAY_MONTH_RE = re.compile(rf"(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTHS})")
+
+_MONTH_NUM = {
+    m: i
+    for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+_WEEKDAY_NUM = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+_RELATIVE_DAYS = {"today": 0, "tonight": 0, "tomorrow": 1}
+
+# Cheap presence probe: every match of _DATE_RE/_TIME_RE contains a digit or
+# one of these words, so a miss here proves the full scans would find nothing.
+_DATETIME_PROBE = re.compile(
+    r"\d|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|noon|midnight|today|tonight|tomorrow",
+    re.IGNORECASE,
+)
+
+# All non-event keywords folded into one pattern so the guard is a single
+# scan of the email instead of one substring search per keyword.
+_NON_EVENT_RE = re.compile("|".join(map(re.escape, sorted(NON_EVENT_KEYWORDS))))
+
+
+def _resolve_month_day(
+    year: Optional[int], month: int, day: int, today: date
+) -> Optional[date]:
+    """Build a date, rolling a year-less mention forward to the next one."""
+    try:
+        if year is not None:
+            return date(year, month, day)
+        candidate = date(today.year, month, day)
+        if candidate < today:
+            candidate = date(today.year + 1, month, day)
+        return candidate
+    except ValueError:
+        return None
+
+
+def _fast_parse_future(date_str: str, today: date) -> Optional[date]:
+    """Resolve common date shapes without invoking dateparser.
+
+    Mirrors dateparser's PREFER_DATES_FROM="future" behaviour for the
+    formats our own patterns match; returns None for anything else so the
+    caller can fall back to the general parser.
+    """
+    s = date_str.strip().lower()
+
+    offset = _RELATIVE_DAYS.get(s)
+    if offset is not None:
+        return today + timedelta(days=offset)
+
+    weekday = _WEEKDAY_NUM.get(s)
+    if weekday is not None:
+        return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+    m = _ISO_DATE_RE.fullmatch(s)
+    if m:
+        try:
+            return date(int(m[1]), int(m[2]), int(m[3]))
+        except ValueError:
+            return None
+
+    m = _SLASH_DATE_RE.fullmatch(s)
+    if m:
+        # Day-first by default (the mail we ingest is DD/MM/YYYY); swap if
+        # that reading is impossible.
+        day, month, year = int(m[1]), int(m[2]), int(m[3])
+        if year < 100:
+            year += 2000
+        if month > 12 and day <= 12:
+            day, month = month, day
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    m = _MONTH_DAY_RE.fullmatch(s)
+    if m:
+        year = int(m[3]) if m[3] else None
+        return _resolve_month_day(year, _MONTH_NUM[m[1][:3]], int(m[2]), today)
+
+    m = _DAY_MONTH_RE.fullmatch(s)
+    if m:
+        return _resolve_month_day(None, _MONTH_NUM[m[2][:3]], int(m[1]), today)
+
+    return None
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_future_fallback(date_str: str) -> Optional[date]:
+    """Memoized dateparser fallback for strings the fast path declines.
+
+    Mailing lists repeat the same phrasings across emails, so the cache hit
+    rate is high. Relative strings ("monday", "tomorrow") never reach here --
+    the fast path resolves them -- so cached entries are absolute dates and
+    safe to reuse across calls.
+    """
+    parsed = dateparser.parse(date_str, settings={"PREFER_DATES_FROM": "future"})
+    return parsed.date() if parsed else None
+
+
+def contains_date_or_time(
+    text: str,
+) -> Tuple[bool, Optional[Tuple[List[str], List[str]]]]:
+    """Check whether the text mentions a usable (non-past) date or time.
+
+    Returns (found, (date_strings, time_strings)). An email whose only date
+    mentions are in the past is treated as having no usable date.
+    """
+    if not _DATETIME_PROBE.search(text):
+        return False, None
+
+    date_ents = set(_DATE_RE.findall(text))
+    time_ents = set(_TIME_RE.findall(text))
+
+    if not date_ents and not time_ents:
+        return False, None
+
+    if date_ents:
+        today = datetime.now().date()
+        has_future_or_present_date = False
+        for date_str in date_ents:
+            parsed_date = _fast_parse_future(date_str, today)
+            if parsed_date is None:
+                parsed_date = _parse_future_fallback(date_str)
+            if parsed_date is not None and parsed_date >= today:
+                has_future_or_present_date = True
+                break
+        if not has_future_or_present_date:
+            return False, None
+
+    return True, (list(date_ents), list(time_ents))
+
+
+# Filter-verdict cache for near-duplicate mailing-list deliveries, keyed by
+# a digest of the combined text with FIFO eviction. The filter is
+# deterministic except for the future-date cutoff; a cached drop stays valid
+# (past dates never become future again) and a cached keep is revalidated by
+# the LLM layer anyway, so going slightly stale across days is harmless.
+_VERDICT_CACHE: Dict[bytes, bool] = {}
+_VERDICT_CACHE_MAX = 4096
+
+
+def _passes_filter(combined_lower: str) -> bool:
+    key = hashlib.blake2b(combined_lower.encode(), digest_size=16).digest()
+    cached = _VERDICT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if _NON_EVENT_RE.search(combined_lower):
+        verdict = False
+    else:
+        verdict, _ = contains_date_or_time(combined_lower)
+
+    if len(_VERDICT_CACHE) >= _VERDICT_CACHE_MAX:
+        _VERDICT_CACHE.pop(next(iter(_VERDICT_CACHE)))
+    _VERDICT_CACHE[key] = verdict
+    return verdict
+
+
+def prefilter_emails(email_dicts: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Run the cheap pre-LLM filter over a whole batch in one pass.
+
+    Each email is lowercased once and scanned once per check: emails that
+    hit a non-event keyword or carry no usable date/time signal are
+    dropped so only plausible events are batched to the LLM.
+    """
+    return [
+        email_dict
+        for email_dict in email_dicts
+        if _passes_filter(
+            f"{email_dict['subject']} {email_dict['content']}".lower()
+        )
+    ]
@@ -1,20 +1,25 @@
 import asyncio
-from typing import Any, Dict
+import os
+from typing import Any, Dict, List
 
 
 job_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
-_worker_task: asyncio.Task | None = None
+_worker_tasks: List[asyncio.Task] = []
 
 _SHUTDOWN_SENTINEL_KEY = "_shutdown"
 
+WORKER_COUNT = int(os.getenv("JOB_QUEUE_WORKERS", "4"))
+
 
 async def start_worker() -> None:
-    """Start the background worker that consumes jobs from job_queue.
+    """Start the background workers that consume jobs from job_queue.
 
-    Uses a sentinel message to terminate gracefully instead of task cancellation
-    so that platform (e.g. Render) shutdowns don't surface CancelledError in logs.
+    Runs WORKER_COUNT workers so jobs for independent users proceed
+    concurrently instead of queueing behind one in-flight sync. Uses a
+    sentinel message per worker to terminate gracefully instead of task
+    cancellation so that platform (e.g. Render) shutdowns don't surface
+    CancelledError in logs.
     """
-    global _worker_task
 
     async def _worker() -> None:
         from app.services.email_sync import handle_job
@@ -35,15 +40,19 @@ async def start_worker() -> None:
         except asyncio.CancelledError:
             pass
 
-    _worker_task = asyncio.create_task(_worker(), name="job-queue-worker")
+    _worker_tasks.extend(
+        asyncio.create_task(_worker(), name=f"job-queue-worker-{i}")
+        for i in range(WORKER_COUNT)
+    )
 
 
 async def stop_worker() -> None:
-    """Signal the worker to stop and wait for it to finish gracefully."""
-    global _worker_task
-    if _worker_task:
+    """Signal the workers to stop and wait for them to finish gracefully."""
+    if not _worker_tasks:
+        return
+    for _ in _worker_tasks:
         await job_queue.put({_SHUTDOWN_SENTINEL_KEY: True})
-        try:
-            await _worker_task
-        finally:
-            _worker_task = None
+    try:
+        await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    finally:
+        _worker_tasks.clear()
@@ -12,19 +12,23 @@ async def get_user_profile(user_id: str):
     try:
         logger.debug(f"Fetching profile for user: {user_id}")
 
-        user = await db.user.find_unique(where={"id": user_id})
+        user = await db.user.find_unique(
+            where={"id": user_id},
+            include={
+                "interests": {"include": {"interest": True}},
+                "customInterests": True,
+            },
+        )
         if not user:
             logger.warning(f"User not found: {user_id}")
             return None
 
-        links = await db.userinterest.find_many(
-            where={"userId": user_id}, include={"interest": True}
-        )
+        links = user.interests or []
         interests = [
             li.interest for li in links if getattr(li, "interest", None) is not None
         ]
 
-        custom = await db.custominterest.find_many(where={"userId": user_id})
+        custom = user.customInterests or []
 
         logger.debug(
             f"Found profile for user {user_id}: {len(interests)} interests, {len(custom)} custom interests"
@@ -47,18 +47,16 @@ async def main():
         existing = await db.interest.find_many()
         existing_pairs = {(i.category, i.child) for i in existing}
 
+        to_create = [
+            {"category": item["category"], "child": item["child"]}
+            for item in INTERESTS
+            if (item["category"], item["child"]) not in existing_pairs
+        ]
         created = 0
-        for item in INTERESTS:
-            key = (item["category"], item["child"])
-            if key in existing_pairs:
-                continue
-            try:
-                await db.interest.create(
-                    data={"category": item["category"], "child": item["child"]}
-                )
-                created += 1
-            except Exception as e:
-                print(f"Skip ({item['category']} - {item['child']}): {e}")
+        if to_create:
+            created = await db.interest.create_many(
+                data=to_create, skip_duplicates=True
+            )
         print(f"Seeding completed. New records inserted: {created}")
     finally:
         await db.disconnect()